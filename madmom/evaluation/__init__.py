@@ -337,6 +337,22 @@ class SimpleEvaluation(EvaluationMixin):
         return self.tostring()
 
 
+def _to_array(values):
+    """
+    Helper function to convert the given values to a numpy array.
+
+    :param values: iterable with values
+    :return:       numpy array with the values
+
+    Note: Numpy arrays are copied directly, converting them to lists first
+          (as needed for all other iterables) is very slow.
+
+    """
+    if isinstance(values, np.ndarray):
+        return np.array(values, dtype=np.float64)
+    return np.asarray(list(values), dtype=np.float64)
+
+
 # evaluate Precision, Recall, F-measure and Accuracy with lists or numpy arrays
 class Evaluation(SimpleEvaluation):
     """
@@ -383,10 +399,10 @@ class Evaluation(SimpleEvaluation):
         # instantiate a SimpleEvaluation object
         super(Evaluation, self).__init__(**kwargs)
         # convert everything to numpy arrays and save them
-        self.tp = np.asarray(list(tp), dtype=np.float)
-        self.fp = np.asarray(list(fp), dtype=np.float)
-        self.tn = np.asarray(list(tn), dtype=np.float)
-        self.fn = np.asarray(list(fn), dtype=np.float)
+        self.tp = _to_array(tp)
+        self.fp = _to_array(fp)
+        self.tn = _to_array(tn)
+        self.fn = _to_array(fn)
 
     @property
     def num_tp(self):
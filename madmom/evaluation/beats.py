@@ -28,8 +28,8 @@ from __future__ import absolute_import, division, print_function
 import warnings
 import numpy as np
 
-from . import (find_closest_matches, calc_errors, calc_absolute_errors,
-               evaluation_io, MeanEvaluation)
+from . import (find_closest_matches, calc_absolute_errors, evaluation_io,
+               MeanEvaluation)
 from .onsets import OnsetEvaluation
 from ..utils import suppress_warnings
 
@@ -51,6 +51,20 @@ class BeatIntervalError(Exception):
 
 
 @suppress_warnings
+def _load_beats_file(filename):
+    """
+    Helper function to load the beats from the given file.
+
+    :param filename: name of the file or file handle
+    :return:         numpy array with beats
+
+    Note: Warnings (e.g. because of empty files) are suppressed. Only the
+          first column (i.e. the beat times) is loaded.
+
+    """
+    return np.loadtxt(filename, ndmin=1, usecols=(0, ))
+
+
 def load_beats(values):
     """
     Load the beats from the given values or file.
@@ -70,16 +84,38 @@ def load_beats(values):
     elif isinstance(values, (list, np.ndarray)):
         # convert to numpy array if possible
         # Note: use array instead of asarray because of ndmin
-        values = np.array(values, dtype=np.float, ndmin=1, copy=False)
+        values = np.array(values, dtype=np.float64, ndmin=1, copy=False)
     else:
         # try to load the data from file
-        values = np.loadtxt(values, ndmin=1)
-    # 1st column is the beat time, the rest is ignored
+        # Note: only loading from file needs to suppress warnings, thus
+        #       lists and arrays are handled without the overhead
+        values = _load_beats_file(values)
+    # 1st column is the beat time, the rest is ignored (lists & arrays)
     if values.ndim > 1:
         return values[:, 0]
     return values
 
 
+def _ensure_float(values):
+    """
+    Helper function to make sure the given values are a contiguous float numpy
+    array.
+
+    :param values: list or numpy array
+    :return:       contiguous numpy array with float dtype
+
+    Note: Arrays which have the correct dtype and memory layout already are
+          returned unaltered without any further checks. Strided views (e.g.
+          the half or third tempo variations of a beat sequence) are copied,
+          since searching the closest matches in them is slower.
+
+    """
+    if isinstance(values, np.ndarray) and values.dtype == np.float64 and \
+            values.flags.c_contiguous:
+        return values
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
 # function for sequence variations generation
 def variations(sequence, offbeat=False, double=False, half=False,
                triple=False, third=False):
@@ -104,10 +140,13 @@ def variations(sequence, offbeat=False, double=False, half=False,
             double_sequence = []
         else:
             # create a sequence with double tempo
-            same = np.arange(0, len(sequence))
-            # request one item less, otherwise we would extrapolate
-            shifted = np.arange(0, len(sequence), 0.5)[:-1]
-            double_sequence = np.interp(shifted, same, sequence)
+            # Note: since the beats are interpolated on a regular grid, we
+            #       can fill in the values directly instead of using interp;
+            #       stop at the last beat, otherwise we would extrapolate
+            sequence = _ensure_float(sequence)
+            double_sequence = np.empty(2 * len(sequence) - 1)
+            double_sequence[0::2] = sequence
+            double_sequence[1::2] = sequence[:-1] + 0.5 * np.diff(sequence)
         # same tempo, half tempo off
         if offbeat:
             sequences.append(double_sequence[1::2])
@@ -127,10 +166,14 @@ def variations(sequence, offbeat=False, double=False, half=False,
             triple_sequence = []
         else:
             # create a annotation sequence with triple tempo
-            same = np.arange(0, len(sequence))
-            # request two items less, otherwise we would extrapolate
-            shifted = np.arange(0, len(sequence), 1. / 3)[:-2]
-            triple_sequence = np.interp(shifted, same, sequence)
+            # Note: fill in the values directly (see above); stop at the last
+            #       beat, otherwise we would extrapolate
+            sequence = _ensure_float(sequence)
+            interval = np.diff(sequence)
+            triple_sequence = np.empty(3 * len(sequence) - 2)
+            triple_sequence[0::3] = sequence
+            triple_sequence[1::3] = sequence[:-1] + interval / 3.
+            triple_sequence[2::3] = sequence[:-1] + 2. * interval / 3.
         # triple tempo
         sequences.append(triple_sequence)
     if third:
@@ -161,7 +204,8 @@ def calc_intervals(events, fwd=False):
     # at least 2 events must be given to calculate an interval
     if len(events) < 2:
         raise BeatIntervalError
-    interval = np.zeros_like(events)
+    # Note: all values get overwritten, thus no need to initialise the array
+    interval = np.empty_like(events)
     if fwd:
         interval[:-1] = np.diff(events)
         # set the last interval to the same value as the second last
@@ -174,6 +218,51 @@ def calc_intervals(events, fwd=False):
     return interval
 
 
+def _intervals(annotations):
+    """
+    Helper function to calculate the intervals surrounding the annotations.
+
+    :param annotations: numpy array with the annotated beats [float, seconds]
+    :return:            numpy array with the intervals [seconds]
+
+    Note: The returned array has one element more than the annotations, the
+          interval of the i-th annotation to the previous annotation is at
+          position i, the interval to the next annotation at position i + 1.
+
+    """
+    # Note: it is faster if we combine the forward and backward intervals,
+    #       but we need to take care of the sizes; intervals to the next
+    #       annotation are always the same as those at the next index
+    intervals = np.empty(len(annotations) + 1)
+    # intervals to previous annotation
+    intervals[1:-1] = np.diff(annotations)
+    # interval of the first annotation to the left is the same as to the right
+    intervals[0] = intervals[1]
+    # interval of the last annotation to the right is the same as to the left
+    intervals[-1] = intervals[-2]
+    return intervals
+
+
+def _closest_intervals(errors, matches, intervals):
+    """
+    Helper function to select the closest annotated interval for each beat
+    detection given its error to the closest annotation.
+
+    :param errors:    numpy array with the errors of the detections to the
+                      closest annotations [float, seconds]
+    :param matches:   numpy array with indices of the closest beats [int]
+    :param intervals: numpy array with the intervals surrounding the
+                      annotations (as returned by _intervals()) [seconds]
+    :return:          numpy array with closest annotated intervals [seconds]
+
+    """
+    # only the sign of the errors is needed; if the detection is after the
+    # annotation (i.e. positive error) use the interval towards the next
+    # annotation, otherwise (i.e. the detection is before the annotation or
+    # at the same position) the interval to the previous annotation
+    return np.where(errors > 0, intervals[matches + 1], intervals[matches])
+
+
 def find_closest_intervals(detections, annotations, matches=None):
     """
     Find the closest annotated interval for each beat detection. For each
@@ -194,39 +283,22 @@ def find_closest_intervals(detections, annotations, matches=None):
     """
     # if no detection are given, return an empty interval array
     if len(detections) == 0:
-        return np.zeros(0, dtype=np.float)
+        return np.zeros(0, dtype=np.float64)
     # at least annotations must be given
     if len(annotations) < 2:
         raise BeatIntervalError
     # make sure the annotations and detections have a float dtype
-    detections = np.asarray(detections, dtype=np.float)
-    annotations = np.asarray(annotations, dtype=np.float)
-    # init array
-    closest_interval = np.ones_like(detections)
-    # intervals
-    # Note: it is faster if we combine the forward and backward intervals,
-    #       but we need to take care of the sizes; intervals to the next
-    #       annotation are always the same as those at the next index
-    intervals = np.zeros(len(annotations) + 1)
-    # intervals to previous annotation
-    intervals[1:-1] = np.diff(annotations)
-    # interval of the first annotation to the left is the same as to the right
-    intervals[0] = intervals[1]
-    # interval of the last annotation to the right is the same as to the left
-    intervals[-1] = intervals[-2]
+    detections = _ensure_float(detections)
+    annotations = _ensure_float(annotations)
     # determine the closest annotations
     if matches is None:
         matches = find_closest_matches(detections, annotations)
-    # calculate the absolute errors
-    errors = calc_errors(detections, annotations, matches)
-    # if the errors are positive, the detection is after the annotation
-    # thus use the interval towards the next annotation
-    closest_interval[errors > 0] = intervals[matches[errors > 0] + 1]
-    # if the errors are 0 or negative, the detection is before the annotation
-    # or at the same position; thus use the interval to previous annotation
-    closest_interval[errors <= 0] = intervals[matches[errors <= 0]]
-    # return the closest interval
-    return closest_interval
+    else:
+        matches = np.asarray(matches, dtype=np.intp)
+    # errors of the detections to the closest annotations
+    errors = detections - annotations[matches]
+    # return the closest intervals
+    return _closest_intervals(errors, matches, _intervals(annotations))
 
 
 def find_longest_continuous_segment(sequence_indices):
@@ -240,16 +312,17 @@ def find_longest_continuous_segment(sequence_indices):
     """
     # continuous segments have consecutive indices, i.e. diffs =! 1 are
     # boundaries between continuous segments; add 1 to get the correct index
-    boundaries = np.nonzero(np.diff(sequence_indices) != 1)[0] + 1
+    boundaries = np.flatnonzero(np.diff(sequence_indices) != 1) + 1
     # add a start (index 0) and stop (length of correct detections) to the
     # segment boundary indices
     boundaries = np.concatenate(([0], boundaries, [len(sequence_indices)]))
     # lengths of the individual segments
     segment_lengths = np.diff(boundaries)
     # return the length and start position of the longest continuous segment
-    length = int(np.max(segment_lengths))
-    start_pos = int(boundaries[np.argmax(segment_lengths)])
-    return length, start_pos
+    # Note: the position of the longest segment is sufficient to determine
+    #       both values, no need to search for the maximum separately
+    longest = np.argmax(segment_lengths)
+    return int(segment_lengths[longest]), int(boundaries[longest])
 
 
 def calc_relative_errors(detections, annotations, matches=None):
@@ -268,20 +341,25 @@ def calc_relative_errors(detections, annotations, matches=None):
     """
     # if no detection are given, return an empty interval array
     if len(detections) == 0:
-        return np.zeros(0, dtype=np.float)
+        return np.zeros(0, dtype=np.float64)
     # at least annotations must be given
     if len(annotations) < 2:
         raise BeatIntervalError
     # make sure the annotations and detections have a float dtype
-    detections = np.asarray(detections, dtype=np.float)
-    annotations = np.asarray(annotations, dtype=np.float)
+    detections = _ensure_float(detections)
+    annotations = _ensure_float(annotations)
     # determine the closest annotations
     if matches is None:
         matches = find_closest_matches(detections, annotations)
+    else:
+        matches = np.asarray(matches, dtype=np.intp)
     # calculate the absolute errors
-    errors = calc_errors(detections, annotations, matches)
+    errors = detections - annotations[matches]
     # get the closest intervals
-    intervals = find_closest_intervals(detections, annotations, matches)
+    # Note: use the errors directly to select the intervals instead of
+    #       calling find_closest_intervals(), which would need to check the
+    #       arguments and compare the positions again
+    intervals = _closest_intervals(errors, matches, _intervals(annotations))
     # return the relative errors
     return errors / intervals
 
@@ -299,13 +377,16 @@ INFORMATION_GAIN_BINS = 40
 
 
 # evaluation functions for beat detection
-def pscore(detections, annotations, tolerance=PSCORE_TOLERANCE):
+def pscore(detections, annotations, tolerance=PSCORE_TOLERANCE,
+           matches=None, window=None):
     """
     Calculate the P-score accuracy for the given detections and annotations.
 
     :param detections:  numpy array with the detected beats [float, seconds]
     :param annotations: numpy array with the annotated beats [float, seconds]
     :param tolerance:   tolerance window (fraction of the median beat interval)
+    :param matches:     numpy array with indices of the closest beats [int]
+    :param window:      pre-computed tolerance window [seconds, float]
     :return:            p-score
 
     The P-score is determined by taking the sum of the cross-correlation
@@ -321,6 +402,11 @@ def pscore(detections, annotations, tolerance=PSCORE_TOLERANCE):
           but rather count all detections falling withing the defined tolerance
           window.
 
+          To speed up the calculation, a list of pre-computed indices of the
+          closest matches can be used. If the same annotations are evaluated
+          multiple times, the tolerance window can be pre-computed as well;
+          the given tolerance is ignored in this case.
+
     """
     # neither detections nor annotations are given, perfect score
     if len(detections) == 0 and len(annotations) == 0:
@@ -338,13 +424,14 @@ def pscore(detections, annotations, tolerance=PSCORE_TOLERANCE):
         raise ValueError("Tolerance must be greater than 0.")
 
     # make sure the annotations and detections have a float dtype
-    detections = np.asarray(detections, dtype=np.float)
-    annotations = np.asarray(annotations, dtype=np.float)
+    detections = _ensure_float(detections)
+    annotations = _ensure_float(annotations)
 
     # the error window is the given fraction of the median beat interval
-    window = tolerance * np.median(np.diff(annotations))
+    if window is None:
+        window = tolerance * np.median(np.diff(annotations))
     # errors
-    errors = calc_absolute_errors(detections, annotations)
+    errors = calc_absolute_errors(detections, annotations, matches)
     # count the instances where the error is smaller or equal than the window
     p = len(detections[errors <= window])
     # normalize by the max number of detections/annotations
@@ -353,19 +440,23 @@ def pscore(detections, annotations, tolerance=PSCORE_TOLERANCE):
     return p
 
 
-def cemgil(detections, annotations, sigma=CEMGIL_SIGMA):
+def cemgil(detections, annotations, sigma=CEMGIL_SIGMA, matches=None):
     """
     Calculate the Cemgil accuracy for the given detections and annotations.
 
     :param detections:  numpy array with the detected beats [float, seconds]
     :param annotations: numpy array with the annotated beats [float, seconds]
     :param sigma:       sigma for Gaussian error function [float]
+    :param matches:     numpy array with indices of the closest beats [int]
     :return:            beat tracking accuracy
 
     "On tempo tracking: Tempogram representation and Kalman filtering"
     A.T. Cemgil, B. Kappen, P. Desain, and H. Honing
     Journal Of New Music Research, vol. 28, no. 4, pp. 259–273, 2001
 
+    Note: To speed up the calculation, a list of pre-computed indices of the
+          closest matches can be used.
+
     """
     # neither detections nor annotations are given, perfect score
     if len(detections) == 0 and len(annotations) == 0:
@@ -379,15 +470,15 @@ def cemgil(detections, annotations, sigma=CEMGIL_SIGMA):
         raise ValueError("Sigma must be greater than 0.")
 
     # make sure the annotations and detections have a float dtype
-    detections = np.asarray(detections, dtype=np.float)
-    annotations = np.asarray(annotations, dtype=np.float)
+    detections = _ensure_float(detections)
+    annotations = _ensure_float(annotations)
 
     # determine the abs. errors of the detections to the closest annotations
     # Note: the original implementation searches for the closest matches of
     #       detections given the annotations. Since absolute errors > a usual
     #       beat interval produce high errors (and thus in turn add negligible
     #       values to the accuracy), it is safe to swap those two.
-    errors = calc_absolute_errors(detections, annotations)
+    errors = calc_absolute_errors(detections, annotations, matches)
     # apply a Gaussian error function with the given std. dev. on the errors
     acc = np.exp(-(errors ** 2.) / (2. * (sigma ** 2.)))
     # and sum up the accuracy
@@ -433,8 +524,8 @@ def goto(detections, annotations, threshold=GOTO_THRESHOLD, sigma=GOTO_SIGMA,
         raise ValueError("Threshold, sigma and mu must be positive.")
 
     # make sure the annotations and detections have a float dtype
-    detections = np.asarray(detections, dtype=np.float)
-    annotations = np.asarray(annotations, dtype=np.float)
+    detections = _ensure_float(detections)
+    annotations = _ensure_float(annotations)
 
     # get the indices of the closest detections to the annotations to determine
     # the longest continuous segment
@@ -444,9 +535,15 @@ def goto(detections, annotations, threshold=GOTO_THRESHOLD, sigma=GOTO_SIGMA,
     #       half a beat interval, thus our threshold is halved (same applies to
     #       sigma and mu)
     # errors of the detections relative to the surrounding annotation interval
-    errors = calc_relative_errors(detections, annotations)
+    # Note: only the errors of the detections closest to the annotations are
+    #       needed, thus do not calculate them for all detections
+    errors = calc_relative_errors(detections[closest], annotations)
     # the absolute error must be smaller than the given threshold
-    closest = closest[np.abs(errors[closest]) <= threshold]
+    # Note: compare with the positive and negative threshold directly instead
+    #       of computing the absolute errors first
+    correct = (errors >= -threshold) & (errors <= threshold)
+    closest = closest[correct]
+    errors = errors[correct]
     # get the length and start position of the longest continuous segment
     length, start = find_longest_continuous_segment(closest)
     # three conditions must be met to identify the segment as correct
@@ -458,7 +555,7 @@ def goto(detections, annotations, threshold=GOTO_THRESHOLD, sigma=GOTO_SIGMA,
     if length < 0.25 * len(annotations):
         return 0.
     # errors of the longest segment
-    segment_errors = errors[closest[start: start + length]]
+    segment_errors = errors[start: start + length]
     # 2) mean of the errors must not exceed mu
     if np.mean(np.abs(segment_errors)) > mu:
         return 0.
@@ -472,65 +569,47 @@ def goto(detections, annotations, threshold=GOTO_THRESHOLD, sigma=GOTO_SIGMA,
     return 1.
 
 
-def cml(detections, annotations, phase_tolerance=CONTINUITY_PHASE_TOLERANCE,
-        tempo_tolerance=CONTINUITY_TEMPO_TOLERANCE):
+def _cml(detections, annotations, det_interval, phase_tolerance,
+         tempo_tolerance, matches=None):
     """
-    Calculate the cmlc and cmlt scores for the given detections and
-    annotations.
+    Helper function to calculate the cmlc and cmlt scores for the given
+    detections and annotations with pre-computed detection intervals.
 
     :param detections:      numpy array with the detected beats
                             [float, seconds]
     :param annotations:     numpy array with the annotated beats
                             [float, seconds]
+    :param det_interval:    numpy array with the detection intervals
+                            [float, seconds]
     :param phase_tolerance: phase tolerance window [float]
     :param tempo_tolerance: tempo tolerance window [float]
+    :param matches:         numpy array with indices of the closest beats
+                            [int]
     :return:                cmlc, cmlt
 
-    "Techniques for the automated analysis of musical audio"
-    S. Hainsworth
-    Ph.D. dissertation, Department of Engineering, Cambridge University, 2004.
-
-    "Analysis of the meter of acoustic musical signals"
-    A. P. Klapuri, A. Eronen, and J. Astola
-    IEEE Transactions on Audio, Speech and Language Processing, vol. 14, no. 1,
-    pp. 342–355, 2006.
+    Note: No sanity checks are performed on the arguments. This function is
+          used by continuity() to evaluate the same detections against
+          different annotation variations without recomputing the intervals
+          of the detections every time.
 
     """
-    # neither detections nor annotations are given
-    if len(detections) == 0 and len(annotations) == 0:
-        return 1., 1.
-    # either beat detections or annotations are empty, score 0
-    if (len(detections) == 0) != (len(annotations) == 0):
-        return 0., 0.
-    # at least 2 annotations must be given to calculate an interval
-    if len(annotations) < 2:
-        raise BeatIntervalError("At least 2 annotations are needed for "
-                                "continuity scores, %s given." % annotations)
-    # TODO: remove this, see TODO below
-    if len(detections) < 2:
-        raise BeatIntervalError("At least 2 detections are needed for"
-                                "continuity scores, %s given." % detections)
-
-    # tolerances must be greater than 0
-    if float(tempo_tolerance) <= 0 or float(phase_tolerance) <= 0:
-        raise ValueError("Tempo and phase tolerances must be greater than 0")
-
-    # make sure the annotations and detections have a float dtype
-    detections = np.asarray(detections, dtype=np.float)
-    annotations = np.asarray(annotations, dtype=np.float)
-
     # determine closest annotations to detections
-    closest = find_closest_matches(detections, annotations)
-    # errors of the detections wrt. to the annotations
-    errors = calc_absolute_errors(detections, annotations, closest)
-    # detection intervals
-    det_interval = calc_intervals(detections)
+    if matches is None:
+        closest = find_closest_matches(detections, annotations)
+    else:
+        closest = matches
     # annotation intervals (get those intervals at the correct positions)
     ann_interval = calc_intervals(annotations)[closest]
+    # errors of the detections wrt. to the annotations
+    # Note: calculate them directly with the closest matches, since the
+    #       arrays are known to be valid already
+    errors = detections - annotations[closest]
     # a detection is correct, if it fulfills 2 conditions:
     # 1) must match an annotation within a certain tolerance window, i.e. the
-    #    phase must be correct
-    correct_phase = detections[errors <= ann_interval * phase_tolerance]
+    #    phase must be correct (i.e. the absolute error must not exceed the
+    #    window, compare with the negative and positive window directly)
+    window = ann_interval * phase_tolerance
+    correct_phase = (errors >= -window) & (errors <= window)
     # Note: the initially cited technical report has an additional condition
     #       ii) on page 5 which requires the same condition to be true for the
     #       previous detection / annotation combination. We do not enforce
@@ -540,27 +619,159 @@ def cml(detections, annotations, phase_tolerance=CONTINUITY_PHASE_TOLERANCE,
     # 2) the tempo, i.e. the intervals, must be within the tempo tolerance
     # TODO: as agreed with Matthew, this should only be enforced from the 2nd
     #       beat onwards.
-    correct_tempo = detections[abs(1 - (det_interval / ann_interval)) <=
-                               tempo_tolerance]
-    # combine the conditions
-    correct = np.intersect1d(correct_phase, correct_tempo)
-    # convert to indices
-    correct_idx = np.searchsorted(detections, correct)
+    correct_tempo = abs(1 - (det_interval / ann_interval)) <= tempo_tolerance
+    # combine the conditions and convert to indices
+    correct_idx = np.flatnonzero(correct_phase & correct_tempo)
     # cmlc: longest continuous segment of detections normalized by the max.
     #       length of both sequences (detection and annotations)
     length = float(max(len(detections), len(annotations)))
     longest, _ = find_longest_continuous_segment(correct_idx)
     cmlc = longest / length
     # cmlt: same but for all detections (no need for continuity)
-    cmlt = len(correct) / length
+    cmlt = len(correct_idx) / length
     # return a tuple
     return cmlc, cmlt
 
 
+def _cml_batch(detections, sequences, det_interval, phase_tolerance,
+               tempo_tolerance, cmlc=0., cmlt=0.):
+    """
+    Helper function to calculate the highest cmlc and cmlt scores of the given
+    detections evaluated against multiple annotation sequences.
+
+    :param detections:      numpy array with the detected beats
+                            [float, seconds]
+    :param sequences:       list with annotated beat sequences
+                            [float, seconds]
+    :param det_interval:    numpy array with the detection intervals
+                            [float, seconds]
+    :param phase_tolerance: phase tolerance window [float]
+    :param tempo_tolerance: tempo tolerance window [float]
+    :param cmlc:            cmlc score found already [float]
+    :param cmlt:            cmlt score found already [float]
+    :return:                highest cmlc, cmlt
+
+    Note: No sanity checks are performed on the detections and intervals. The
+          given scores are returned if none of the sequences achieves higher
+          scores. Sequences which are too short to calculate intervals are
+          ignored.
+
+    """
+    for sequence in sequences:
+        # both scores are limited by the number of detections normalized by
+        # the max. length of detections and annotations; skip the sequences
+        # which can not achieve higher accuracies than those found already
+        # Note: cmlc <= cmlt, thus it is enough to check cmlc
+        max_score = len(detections) / float(max(len(detections),
+                                                len(sequence)))
+        if max_score <= cmlc:
+            continue
+        # if other sequences achieve higher accuracies, take these values
+        try:
+            # Note: catch the IntervalError here, because the sequences could
+            #       be too short for valid interval calculation; ok, since we
+            #       already have valid values for cmlc & cmlt
+            # Note: the sequences are mostly strided views of the annotations
+            #       (see variations()), thus make them contiguous before
+            #       searching the closest matches
+            sequence = _ensure_float(sequence)
+            c, t = _cml(detections, sequence, det_interval, phase_tolerance,
+                        tempo_tolerance)
+        except BeatIntervalError:
+            c, t = np.nan, np.nan
+        cmlc = max(cmlc, c)
+        cmlt = max(cmlt, t)
+        # stop if perfect scores are reached (cmlt can not be lower than cmlc)
+        if cmlc >= 1:
+            break
+    # return a tuple
+    return cmlc, cmlt
+
+
+def _check_cml_arguments(detections, annotations, phase_tolerance,
+                         tempo_tolerance):
+    """
+    Helper function to check the arguments of the cmlc and cmlt calculation.
+
+    :param detections:      numpy array with the detected beats
+                            [float, seconds]
+    :param annotations:     numpy array with the annotated beats
+                            [float, seconds]
+    :param phase_tolerance: phase tolerance window [float]
+    :param tempo_tolerance: tempo tolerance window [float]
+
+    """
+    # at least 2 annotations must be given to calculate an interval
+    if len(annotations) < 2:
+        raise BeatIntervalError("At least 2 annotations are needed for "
+                                "continuity scores, %s given." % annotations)
+    # TODO: remove this, see TODO below
+    if len(detections) < 2:
+        raise BeatIntervalError("At least 2 detections are needed for"
+                                "continuity scores, %s given." % detections)
+
+    # tolerances must be greater than 0
+    if float(tempo_tolerance) <= 0 or float(phase_tolerance) <= 0:
+        raise ValueError("Tempo and phase tolerances must be greater than 0")
+
+
+def cml(detections, annotations, phase_tolerance=CONTINUITY_PHASE_TOLERANCE,
+        tempo_tolerance=CONTINUITY_TEMPO_TOLERANCE, matches=None):
+    """
+    Calculate the cmlc and cmlt scores for the given detections and
+    annotations.
+
+    :param detections:      numpy array with the detected beats
+                            [float, seconds]
+    :param annotations:     numpy array with the annotated beats
+                            [float, seconds]
+    :param phase_tolerance: phase tolerance window [float]
+    :param tempo_tolerance: tempo tolerance window [float]
+    :param matches:         numpy array with indices of the closest beats
+                            [int]
+    :return:                cmlc, cmlt
+
+    "Techniques for the automated analysis of musical audio"
+    S. Hainsworth
+    Ph.D. dissertation, Department of Engineering, Cambridge University, 2004.
+
+    "Analysis of the meter of acoustic musical signals"
+    A. P. Klapuri, A. Eronen, and J. Astola
+    IEEE Transactions on Audio, Speech and Language Processing, vol. 14, no. 1,
+    pp. 342–355, 2006.
+
+    Note: To speed up the calculation, a list of pre-computed indices of the
+          closest matches can be used.
+
+    """
+    # neither detections nor annotations are given
+    if len(detections) == 0 and len(annotations) == 0:
+        return 1., 1.
+    # either beat detections or annotations are empty, score 0
+    if (len(detections) == 0) != (len(annotations) == 0):
+        return 0., 0.
+    # check the arguments
+    _check_cml_arguments(detections, annotations, phase_tolerance,
+                         tempo_tolerance)
+
+    # make sure the annotations and detections have a float dtype
+    detections = _ensure_float(detections)
+    annotations = _ensure_float(annotations)
+
+    if matches is not None:
+        matches = np.asarray(matches, dtype=np.intp)
+
+    # detection intervals
+    det_interval = calc_intervals(detections)
+    # calculate the scores
+    return _cml(detections, annotations, det_interval, phase_tolerance,
+                tempo_tolerance, matches)
+
+
 def continuity(detections, annotations,
                phase_tolerance=CONTINUITY_PHASE_TOLERANCE,
                tempo_tolerance=CONTINUITY_TEMPO_TOLERANCE,
-               offbeat=True, double=True, triple=True):
+               offbeat=True, double=True, triple=True, matches=None):
     """
     Calculate the cmlc, cmlt, amlc and amlt scores for the given detections and
     annotations.
@@ -574,6 +785,8 @@ def continuity(detections, annotations,
     :param offbeat:         include offbeat variation
     :param double:          include 2x and 1/2x tempo variations
     :param triple:          include 3x and 1/3x tempo variations
+    :param matches:         numpy array with indices of the closest beats
+                            [int]
     :return:                cmlc, cmlt, amlc, amlt beat tracking accuracies
 
     cmlc: tracking accuracy, continuity at the correct metrical level required
@@ -590,6 +803,10 @@ def continuity(detections, annotations,
     IEEE Transactions on Audio, Speech and Language Processing, vol. 14, no. 1,
     pp. 342–355, 2006.
 
+    Note: To speed up the calculation, a list of pre-computed indices of the
+          closest matches can be used. They are only used for evaluating the
+          correct metrical level, not for the variations.
+
     """
     # neither detections nor annotations are given
     if len(detections) == 0 and len(annotations) == 0:
@@ -598,8 +815,24 @@ def continuity(detections, annotations,
     if (len(detections) == 0) != (len(annotations) == 0):
         return 0., 0., 0., 0.
 
+    # make sure the annotations and detections have a float dtype
+    # Note: convert them only once, all functions called below (and the
+    #       annotation variations) can use the arrays directly
+    detections = _ensure_float(detections)
+    annotations = _ensure_float(annotations)
+
+    # check the arguments (the same way cml() does)
+    _check_cml_arguments(detections, annotations, tempo_tolerance,
+                         phase_tolerance)
+    if matches is not None:
+        matches = np.asarray(matches, dtype=np.intp)
+    # the detections are the same for all variants, thus calculate their
+    # intervals only once
+    det_interval = calc_intervals(detections)
+
     # evaluate the correct tempo
-    cmlc, cmlt = cml(detections, annotations, tempo_tolerance, phase_tolerance)
+    cmlc, cmlt = _cml(detections, annotations, det_interval, tempo_tolerance,
+                      phase_tolerance, matches)
     amlc = cmlc
     amlt = cmlt
     # speed up calculation by skipping other metrical levels if the score is
@@ -613,22 +846,17 @@ def continuity(detections, annotations,
     sequences = variations(annotations, offbeat=offbeat, double=double,
                            half=double, triple=triple, third=triple)
     # evaluate these metrical variants
-    for sequence in sequences:
-        # if other metrical levels achieve higher accuracies, take these values
-        try:
-            # Note: catch the IntervalError here, because the beat variants
-            #       could be too short for valid interval calculation;
-            #       ok, since we already have valid values for amlc & amlt
-            c, t = cml(detections, sequence, tempo_tolerance, phase_tolerance)
-        except BeatIntervalError:
-            c, t = np.nan, np.nan
-        amlc = max(amlc, c)
-        amlt = max(amlt, t)
+    amlc, amlt = _cml_batch(detections, sequences, det_interval,
+                            tempo_tolerance, phase_tolerance, amlc, amlt)
 
     # return a tuple
     return cmlc, cmlt, amlc, amlt
 
 
+# cache for the histogram bin edges (number of bins -> bin edges)
+_HISTOGRAM_BINS = {}
+
+
 def _histogram_bins(num_bins):
     """
     Helper function to generate the histogram bins used to calculate the error
@@ -643,6 +871,8 @@ def _histogram_bins(num_bins):
           of the same reason, the first and the last bin are only half as wide
           as the others.
 
+          The returned bin edges are cached and thus read-only.
+
     """
     # allow only even numbers and require at least 2 bins
     if num_bins % 2 != 0 or num_bins < 2:
@@ -651,15 +881,21 @@ def _histogram_bins(num_bins):
         #       to the centre bin is to enforce an even number of bins
         raise ValueError("Number of error histogram bins must be even and "
                          "greater than 0")
-    # since np.histogram accepts a sequence of bin edges we just increase the
-    # number of bins by 1, but we need to apply offset
-    offset = 0.5 / num_bins
-    # because the histogram is made circular by adding the last bin to the
-    # first one before being removed, increase the number of bins by 2
-    return np.linspace(-0.5 - offset, 0.5 + offset, num_bins + 2)
-
-
-def _error_histogram(detections, annotations, histogram_bins):
+    # the bins depend only on the number of bins, thus compute them only once
+    if num_bins not in _HISTOGRAM_BINS:
+        # since np.histogram accepts a sequence of bin edges we just increase
+        # the number of bins by 1, but we need to apply offset
+        offset = 0.5 / num_bins
+        # because the histogram is made circular by adding the last bin to the
+        # first one before being removed, increase the number of bins by 2
+        bins = np.linspace(-0.5 - offset, 0.5 + offset, num_bins + 2)
+        # the bins are shared, thus make sure they can not be altered
+        bins.setflags(write=False)
+        _HISTOGRAM_BINS[num_bins] = bins
+    return _HISTOGRAM_BINS[num_bins]
+
+
+def _error_histogram(detections, annotations, histogram_bins, matches=None):
     """
     Helper function to calculate the relative errors of the given detections
     and annotations and map them to an histogram with the given bins edges.
@@ -668,6 +904,7 @@ def _error_histogram(detections, annotations, histogram_bins):
     :param annotations:    numpy array with the annotated beats
                            [float, seconds]
     :param histogram_bins: histogram bin edges for mapping
+    :param matches:        numpy array with indices of the closest beats [int]
     :return:               error histogram
 
     Note: The returned error histogram is circular, i.e. it contains 1 bin less
@@ -677,11 +914,17 @@ def _error_histogram(detections, annotations, histogram_bins):
 
     """
     # get the relative errors of the detections to the annotations
-    errors = calc_relative_errors(detections, annotations)
+    errors = calc_relative_errors(detections, annotations, matches)
     # map the relative beat errors to the range of -0.5..0.5
-    errors = np.mod(errors + 0.5, -1) + 0.5
+    # Note: this is the same as np.mod(errors + 0.5, -1) + 0.5, but wrapping
+    #       the errors with np.ceil() is much faster than the modulo operation
+    #       and yields exactly the same values (errors on the bin edges are
+    #       thus mapped to the same bins)
+    errors += 0.5
+    errors -= np.ceil(errors)
+    errors += 0.5
     # get bin counts for the given errors over the distribution
-    histogram = np.histogram(errors, histogram_bins)[0].astype(np.float)
+    histogram = np.histogram(errors, histogram_bins)[0].astype(np.float64)
     # make the histogram circular by adding the last bin to the first one
     histogram[0] += histogram[-1]
     # return the histogram without the last bin
@@ -696,42 +939,52 @@ def _entropy(error_histogram):
     :return:                entropy
 
     """
-    # copy the error_histogram, because it must not be altered
-    histogram = np.copy(error_histogram).astype(np.float)
     # normalize the histogram
-    histogram /= np.sum(histogram)
-    # set all 0 values to 1 to make entropy calculation well-behaved
-    histogram[histogram == 0] = 1.
+    histogram = np.asarray(error_histogram, dtype=np.float64)
+    histogram = histogram / np.sum(histogram)
+    # calculate the logarithm only for values > 0 (and use 0 otherwise) to
+    # make entropy calculation well-behaved; no need to alter the histogram
+    log_histogram = np.log2(histogram, out=np.zeros_like(histogram),
+                            where=histogram > 0)
     # calculate entropy
-    return - np.sum(histogram * np.log2(histogram))
+    return - np.sum(histogram * log_histogram)
 
 
-def _information_gain(error_histogram):
+def _information_gain(error_histogram, log2_bins=None):
     """
     Helper function to calculate the information gain of the given error
     histogram.
 
     :param error_histogram: error histogram
+    :param log2_bins:       pre-computed log2 of the number of histogram bins
     :return:                information gain
 
     """
+    # convert the error histogram only once, _entropy() can use it directly
+    error_histogram = np.asarray(error_histogram, dtype=np.float64)
     # calculate the entropy of th error histogram
-    if np.asarray(error_histogram).any():
+    # Note: np.count_nonzero() is much cheaper than ndarray.any()
+    if np.count_nonzero(error_histogram):
         entropy = _entropy(error_histogram)
     else:
         # an empty error histogram has an entropy of 0
         entropy = 0.
+    # the maximum entropy is determined by the number of histogram bins
+    if log2_bins is None:
+        log2_bins = np.log2(len(error_histogram))
     # return information gain
-    return np.log2(len(error_histogram)) - entropy
+    return log2_bins - entropy
 
 
-def information_gain(detections, annotations, num_bins=INFORMATION_GAIN_BINS):
+def information_gain(detections, annotations, num_bins=INFORMATION_GAIN_BINS,
+                     matches=None):
     """
     Calculate information gain for the given detections and annotations.
 
     :param detections:  numpy array with the detected beats [float, seconds]
     :param annotations: numpy array with the annotated beats [float, seconds]
     :param num_bins:    number of bins for the error histogram [int, even]
+    :param matches:     numpy array with indices of the closest beats [int]
     :return:            information gain, beat error histogram
 
     "Measuring the performance of beat tracking algorithms algorithms using a
@@ -739,6 +992,9 @@ def information_gain(detections, annotations, num_bins=INFORMATION_GAIN_BINS):
     M. E. P. Davies, N. Degara and M. D. Plumbley
     IEEE Signal Processing Letters, vol. 18, vo. 3, 2011
 
+    Note: To speed up the calculation, a list of pre-computed indices of the
+          closest matches (of the detections to the annotations) can be used.
+
     """
     # neither detections nor annotations are given, perfect score
     if len(detections) == 0 and len(annotations) == 0:
@@ -754,7 +1010,7 @@ def information_gain(detections, annotations, num_bins=INFORMATION_GAIN_BINS):
         #       and annotations is chosen (instead of just the length of the
         #       annotations as in the Matlab implementation).
         max_length = max(len(detections), len(annotations))
-        return 0., np.ones(num_bins) * max_length / float(num_bins)
+        return 0., np.full(num_bins, max_length / float(num_bins))
 
     # at least 2 annotations must be given to calculate an interval
     if len(detections) < 2 or len(annotations) < 2:
@@ -768,15 +1024,18 @@ def information_gain(detections, annotations, num_bins=INFORMATION_GAIN_BINS):
 
     # create bins edges for the error histogram
     histogram_bins = _histogram_bins(num_bins)
+    # maximum entropy of the error histograms (needed for both directions)
+    log2_bins = np.log2(num_bins)
 
     # evaluate detections against annotations
-    fwd_histogram = _error_histogram(detections, annotations, histogram_bins)
-    fwd_ig = _information_gain(fwd_histogram)
+    fwd_histogram = _error_histogram(detections, annotations, histogram_bins,
+                                     matches)
+    fwd_ig = _information_gain(fwd_histogram, log2_bins)
     # if only a few (but correct) beats are detected, the errors could be small
     # thus evaluate also the annotations against the detections, i.e. simulate
     # a lot of false positive detections
     bwd_histogram = _error_histogram(annotations, detections, histogram_bins)
-    bwd_ig = _information_gain(bwd_histogram)
+    bwd_ig = _information_gain(bwd_histogram, log2_bins)
 
     # only use the lower information gain
     if fwd_ig < bwd_ig:
@@ -848,13 +1107,10 @@ class BeatEvaluation(OnsetEvaluation):
 
         """
         # load the beat detections and annotations
+        # Note: load_beats() returns only the first column (i.e. the time
+        #       stamps) of 2D data
         detections = load_beats(detections)
         annotations = load_beats(annotations)
-        # if these are 2D, use only the first column (i.e. the time stamp)
-        if detections.ndim > 1:
-            detections = detections[:, 0]
-        if annotations.ndim > 1:
-            annotations = annotations[:, 0]
         # sort them
         detections = np.sort(detections)
         annotations = np.sort(annotations)
@@ -870,19 +1126,24 @@ class BeatEvaluation(OnsetEvaluation):
         super(BeatEvaluation, self).__init__(detections, annotations,
                                              window=fmeasure_window, **kwargs)
         # other scores
-        self.pscore = pscore(detections, annotations, pscore_tolerance)
-        self.cemgil = cemgil(detections, annotations, cemgil_sigma)
+        # Note: the closest matches are the same for P-score, Cemgil's
+        #       accuracy, the continuity scores and the information gain,
+        #       thus determine them only once
+        matches = find_closest_matches(detections, annotations)
+        self.pscore = pscore(detections, annotations, pscore_tolerance,
+                             matches)
+        self.cemgil = cemgil(detections, annotations, cemgil_sigma, matches)
         self.goto = goto(detections, annotations, goto_threshold,
                          goto_sigma, goto_mu)
         # continuity scores
         scores = continuity(detections, annotations,
                             continuity_tempo_tolerance,
                             continuity_phase_tolerance,
-                            offbeat, double, triple)
+                            offbeat, double, triple, matches)
         self.cmlc, self.cmlt, self.amlc, self.amlt = scores
         # information gain stuff
         scores = information_gain(detections, annotations,
-                                  information_gain_bins)
+                                  information_gain_bins, matches)
         self.information_gain, self.error_histogram = scores
 
     @property
@@ -917,6 +1178,29 @@ class BeatMeanEvaluation(MeanEvaluation):
 
     """
     METRIC_NAMES = BeatEvaluation.METRIC_NAMES
+    # metrics which are averaged over all evaluation objects
+    MEAN_METRICS = ['fmeasure', 'pscore', 'cemgil', 'goto', 'cmlc', 'cmlt',
+                    'amlc', 'amlt', 'information_gain']
+
+    def _means(self):
+        """
+        Helper method to calculate the means of all averaged metrics.
+
+        :return: dictionary with the mean values of the metrics (NaNs are
+                 ignored)
+
+        Note: The metrics of all evaluation objects are gathered in a single
+              pass. They are not cached, since the evaluation objects (or
+              nested ones) may be altered.
+
+        """
+        # gather the metrics of all evaluation objects in a single pass
+        metrics = np.array([[getattr(e, m) for m in self.MEAN_METRICS]
+                            for e in self.eval_objects], dtype=np.float64)
+        # average each metric over a contiguous row (one row per metric)
+        # Note: this yields exactly the same values as averaging lists
+        metrics = metrics.reshape(-1, len(self.MEAN_METRICS)).T.copy()
+        return dict(zip(self.MEAN_METRICS, np.nanmean(metrics, axis=1)))
 
     @property
     def fmeasure(self):
@@ -970,7 +1254,12 @@ class BeatMeanEvaluation(MeanEvaluation):
             # return an empty error histogram of length 0
             return np.zeros(0)
         # sum all error histograms to gather a global one
-        return np.sum([e.error_histogram for e in self.eval_objects], axis=0)
+        # Note: accumulate them in place instead of stacking all histograms
+        histogram = np.array(self.eval_objects[0].error_histogram,
+                             dtype=np.float64)
+        for e in self.eval_objects[1:]:
+            histogram += e.error_histogram
+        return histogram
 
     @property
     def global_information_gain(self):
@@ -989,14 +1278,17 @@ class BeatMeanEvaluation(MeanEvaluation):
         :return:       evaluation metrics formatted as a human readable string
 
         """
+        # Note: compute the means of all metrics at once
+        means = self._means()
         ret = ''
         if self.name is not None:
             ret += '%s\n  ' % self.name
         ret += 'F-measure: %.3f P-score: %.3f Cemgil: %.3f Goto: %.3f '\
                'CMLc: %.3f CMLt: %.3f AMLc: %.3f AMLt: %.3f D: %.3f '\
                'Dg: %.3f' % \
-               (self.fmeasure, self.pscore, self.cemgil, self.goto, self.cmlc,
-                self.cmlt, self.amlc, self.amlt, self.information_gain,
+               (means['fmeasure'], means['pscore'], means['cemgil'],
+                means['goto'], means['cmlc'], means['cmlt'], means['amlc'],
+                means['amlt'], means['information_gain'],
                 self.global_information_gain)
         return ret
 
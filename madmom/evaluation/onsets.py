@@ -45,8 +45,9 @@ def load_onsets(values):
         values = np.array(values, dtype=np.float, ndmin=1, copy=False)
     else:
         # try to load the data from file
-        values = np.loadtxt(values, ndmin=1)
-    # 1st column is the onset time, the rest is ignored
+        # Note: only the 1st column is needed, thus do not parse the others
+        values = np.loadtxt(values, ndmin=1, usecols=(0, ))
+    # 1st column is the onset time, the rest is ignored (lists & arrays)
     if values.ndim > 1:
         return values[:, 0]
     return values
@@ -57,6 +58,106 @@ WINDOW = 0.025
 COMBINE = 0.03
 
 
+# onset matching helper functions
+def _sort(events):
+    """
+    Helper function to sort the given events.
+
+    :param events: numpy array with events [seconds]
+    :return:       sorted numpy array with events [seconds]
+
+    Note: Checking whether the events are sorted already is much cheaper than
+          sorting them, thus already sorted events are returned unaltered.
+
+    """
+    if np.all(events[1:] >= events[:-1]):
+        return events
+    return np.sort(events)
+
+
+def _match_onsets(det, ann, window):
+    """
+    Helper function to match the detections with the annotations one after
+    another.
+
+    :param det:    sorted numpy array with detected onsets [seconds]
+    :param ann:    sorted numpy array with annotated onsets [seconds]
+    :param window: detection window [seconds, float]
+    :return:       tuple of arrays (tp, fp, fn, errors)
+
+    Note: The detections and annotations are matched by sweeping over both
+          sorted arrays simultaneously. If the first remaining detection and
+          annotation are not within the window, the smaller one of them can
+          not be matched with any of the remaining (larger) ones either. Thus
+          this greedy sweep yields the maximum number of matches, without the
+          need of a general bipartite matching algorithm (e.g. the Hungarian
+          algorithm).
+
+    """
+    # cache variables
+    det_length = len(det)
+    ann_length = len(ann)
+    det_index = 0
+    ann_index = 0
+    # pre-allocate the arrays (with the maximum possible length each) and
+    # fill them while iterating, instead of appending every single value
+    # Note: there can't be more TPs (and thus errors) or FPs than detections
+    #       and not more FNs than annotations
+    tp = np.empty(det_length)
+    fp = np.empty(det_length)
+    fn = np.empty(ann_length)
+    errors = np.empty(det_length)
+    num_tp = 0
+    num_fp = 0
+    num_fn = 0
+    # iterate over Python floats, since indexing numpy arrays element-wise
+    # and computing with numpy scalars is considerably slower
+    det_values = det.tolist()
+    ann_values = ann.tolist()
+    window = float(window)
+    # iterate over all detections and annotations
+    while det_index < det_length and ann_index < ann_length:
+        # fetch the first detection
+        d = det_values[det_index]
+        # fetch the first annotation
+        a = ann_values[ann_index]
+        # compare them
+        if abs(d - a) <= window:
+            # TP detection
+            tp[num_tp] = d
+            # append the error to the array
+            errors[num_tp] = d - a
+            num_tp += 1
+            # increase the detection and annotation index
+            det_index += 1
+            ann_index += 1
+        elif d < a:
+            # FP detection
+            fp[num_fp] = d
+            num_fp += 1
+            # increase the detection index
+            det_index += 1
+            # do not increase the annotation index
+        elif d > a:
+            # we missed a annotation: FN
+            fn[num_fn] = a
+            num_fn += 1
+            # do not increase the detection index
+            # increase the annotation index
+            ann_index += 1
+        else:
+            # can't match detected with annotated onset
+            raise AssertionError('can not match % with %', d, a)
+    # the remaining detections are FP
+    fp[num_fp:num_fp + det_length - det_index] = det[det_index:]
+    num_fp += det_length - det_index
+    # the remaining annotations are FN
+    fn[num_fn:num_fn + ann_length - ann_index] = ann[ann_index:]
+    num_fn += ann_length - ann_index
+    # return only the filled parts of the arrays
+    return tp[:num_tp], fp[:num_fp], fn[:num_fn], errors[:num_tp]
+
+
 # onset evaluation function
 def onset_evaluation(detections, annotations, window=WINDOW):
     """
@@ -109,47 +210,11 @@ def onset_evaluation(detections, annotations, window=WINDOW):
         raise ValueError('window must be greater than 0')
 
     # sort the detections and annotations
-    det = np.sort(detections)
-    ann = np.sort(annotations)
-    # cache variables
-    det_length = len(detections)
-    ann_length = len(annotations)
-    det_index = 0
-    ann_index = 0
-    # iterate over all detections and annotations
-    while det_index < det_length and ann_index < ann_length:
-        # fetch the first detection
-        d = det[det_index]
-        # fetch the first annotation
-        a = ann[ann_index]
-        # compare them
-        if abs(d - a) <= window:
-            # TP detection
-            tp = np.append(tp, d)
-            # append the error to the array
-            errors = np.append(errors, d - a)
-            # increase the detection and annotation index
-            det_index += 1
-            ann_index += 1
-        elif d < a:
-            # FP detection
-            fp = np.append(fp, d)
-            # increase the detection index
-            det_index += 1
-            # do not increase the annotation index
-        elif d > a:
-            # we missed a annotation: FN
-            fn = np.append(fn, a)
-            # do not increase the detection index
-            # increase the annotation index
-            ann_index += 1
-        else:
-            # can't match detected with annotated onset
-            raise AssertionError('can not match % with %', d, a)
-    # the remaining detections are FP
-    fp = np.append(fp, det[det_index:])
-    # the remaining annotations are FN
-    fn = np.append(fn, ann[ann_index:])
+    # Note: most callers (e.g. the beat evaluation) pass sorted arrays already
+    det = _sort(detections)
+    ann = _sort(annotations)
+    # match the detections with the annotations
+    tp, fp, fn, errors = _match_onsets(det, ann, window)
     # check calculations
     if len(tp) + len(fp) != len(detections):
         raise AssertionError('bad TP / FP calculation')
@@ -157,8 +222,9 @@ def onset_evaluation(detections, annotations, window=WINDOW):
         raise AssertionError('bad FN calculation')
     if len(tp) != len(errors):
         raise AssertionError('bad errors calculation')
-    # convert to numpy arrays and return them
-    return np.array(tp), np.array(fp), tn, np.array(fn), np.array(errors)
+    # return the arrays
+    # Note: all of them are numpy arrays already, no need to copy them again
+    return tp, fp, tn, fn, errors
 
 
 # for onset evaluation with Precision, Recall, F-measure use the Evaluation
@@ -189,8 +255,10 @@ class OnsetEvaluation(Evaluation):
         if combine > 0:
             annotations = combine_events(annotations, combine)
         # shift the detections if needed
+        # Note: do not shift them in place, since load_onsets() does not copy
+        #       arrays and thus the given detections would be altered
         if delay != 0:
-            detections += delay
+            detections = detections + delay
         # evaluate
         tp, fp, tn, fn, errors = onset_evaluation(detections, annotations,
                                                   window)
@@ -199,19 +267,47 @@ class OnsetEvaluation(Evaluation):
         # add the errors
         self.errors = errors
 
+    def _error_moments(self):
+        """
+        Helper method to calculate the moments needed for the mean and
+        standard deviation of the errors.
+
+        :return: tuple (number of errors, sum of the errors, sum of the squared
+                 deviations of the errors from their mean)
+
+        Note: The moments are cached as long as the errors do not change.
+
+        """
+        errors = self.errors
+        # Note: compare the identity of the errors, since they are not altered
+        #       once the evaluation is done (but they may be replaced)
+        if getattr(self, '_moments_errors', None) is not errors:
+            if len(errors) == 0:
+                self._moments = (0, 0., 0.)
+            else:
+                # Note: compute them the same way as np.mean() and np.std()
+                total = np.sum(errors)
+                deviations = errors - total / len(errors)
+                self._moments = (len(errors), total,
+                                 np.sum(deviations * deviations))
+            self._moments_errors = errors
+        return self._moments
+
     @property
     def mean_error(self):
         """Mean of the errors."""
-        if len(self.errors) == 0:
+        num, total, _ = self._error_moments()
+        if num == 0:
             return np.nan
-        return np.mean(self.errors)
+        return total / num
 
     @property
     def std_error(self):
         """Standard deviation of the errors."""
-        if len(self.errors) == 0:
+        num, _, squares = self._error_moments()
+        if num == 0:
             return np.nan
-        return np.std(self.errors)
+        return np.sqrt(squares / num)
 
     def tostring(self, **kwargs):
         """
@@ -249,6 +345,31 @@ class OnsetSumEvaluation(SumEvaluation, OnsetEvaluation):
             return np.zeros(0)
         return np.concatenate([e.errors for e in self.eval_objects])
 
+    def _error_moments(self):
+        """
+        Helper method to calculate the moments needed for the mean and
+        standard deviation of the errors.
+
+        :return: tuple (number of errors, sum of the errors, sum of the squared
+                 deviations of the errors from their mean)
+
+        Note: The moments are combined from those of the individual
+              evaluations, thus the errors do not need to be concatenated.
+
+        """
+        # pylint: disable=protected-access
+        moments = np.array([e._error_moments() for e in self.eval_objects],
+                           dtype=np.float64).reshape(-1, 3)
+        # ignore evaluations without errors
+        num, totals, squares = moments[moments[:, 0] > 0].T
+        if len(num) == 0:
+            return 0, 0., 0.
+        total = np.sum(totals)
+        # the squared deviations wrt. the common mean are the squared
+        # deviations wrt. the individual means plus a correction term
+        corrections = num * (totals / num - total / np.sum(num)) ** 2
+        return int(np.sum(num)), total, np.sum(squares + corrections)
+
 
 class OnsetMeanEvaluation(MeanEvaluation, OnsetSumEvaluation):
     """
@@ -306,6 +306,10 @@ class TestPscoreFunction(unittest.TestCase):
         # normal calculation
         score = pscore(DETECTIONS, ANNOTATIONS, 0.2)
         self.assertEqual(score, 0.9)
+        # pre-computed tolerance window (0.2 * median annotation interval)
+        window = 0.2 * np.median(np.diff(ANNOTATIONS))
+        score = pscore(DETECTIONS, ANNOTATIONS, window=window)
+        self.assertEqual(score, 0.9)
 
 
 class TestCemgilFunction(unittest.TestCase):
@@ -642,6 +646,9 @@ class TestContinuityFunction(unittest.TestCase):
         scores = continuity(DETECTIONS, ANNOTATIONS[2::3], 0.175, 0.175,
                             double=False, triple=True)
         self.assertEqual(scores, (0., 0., 0.3, 0.5))
+        # annotations too short for some of the variations (half/third tempo)
+        scores = continuity(DETECTIONS, [1., 2.], 0.175, 0.175)
+        self.assertEqual(scores, (0.2, 0.2, 0.2, 0.2))
 
 
 class TestHistogramBinsHelperFunction(unittest.TestCase):
@@ -1055,6 +1062,19 @@ class TestBeatMeanEvaluationClass(unittest.TestCase):
         error_histogram_[22] = 1
         self.assertTrue(np.allclose(e.error_histogram, error_histogram_))
         self.assertEqual(len(e), 2)
+        # altering the evaluation objects must be reflected in the means
+        e.eval_objects.pop(0)
+        self.assertEqual(e.fmeasure, f2)
+        self.assertEqual(e.cmlc, 0.4)
+        self.assertEqual(len(e), 1)
+        # altering nested evaluation objects must be reflected as well
+        inner = BeatMeanEvaluation([e1])
+        outer = BeatMeanEvaluation([inner])
+        self.assertEqual(outer.fmeasure, 1)
+        inner.eval_objects.append(e2)
+        self.assertEqual(outer.fmeasure, (1 + f2) / 2)
+        self.assertEqual(outer.cmlc, (1 + 0.4) / 2)
+        self.assertEqual(outer.tostring(), inner.tostring())
 
     def test_tostring(self):
         print(BeatMeanEvaluation([]))
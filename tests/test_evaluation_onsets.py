@@ -12,9 +12,41 @@ import math
 
 from madmom.evaluation.onsets import *
 
-DETECTIONS = np.asarray([0.99999999, 1.02999999, 1.45, 2.01, 2.02, 2.5,
-                         3.025000001])
-ANNOTATIONS = np.asarray([1, 1.02, 1.5, 2.0, 2.03, 2.05, 2.5, 3])
+DETECTIONS = np.array([0.99999999, 1.02999999, 1.45, 2.01, 2.02, 2.5,
+                       3.025000001], dtype=np.float64)
+ANNOTATIONS = np.array([1, 1.02, 1.5, 2.0, 2.03, 2.05, 2.5, 3],
+                       dtype=np.float64)
+# the (sorted) onsets are shared by all tests, make sure none alters them
+DETECTIONS.setflags(write=False)
+ANNOTATIONS.setflags(write=False)
+
+# types of the metrics of the onset evaluation classes
+METRIC_TYPES = {'num_tp': int, 'num_fp': int, 'num_tn': int, 'num_fn': int,
+                'precision': float, 'recall': float, 'fmeasure': float,
+                'accuracy': float, 'errors': np.ndarray, 'mean_error': float,
+                'std_error': float}
+
+
+class OnsetTestCase(unittest.TestCase):
+
+    def assertEmpty(self, array):
+        # Note: np.allclose(array, []) also holds for single-element arrays
+        self.assertEqual(np.asarray(array).size, 0)
+
+    def assertTypes(self, evaluation, types):
+        for name, metric_type in types.items():
+            self.assertIsInstance(getattr(evaluation, name), metric_type,
+                                  msg=name)
+
+    def assertAllClose(self, *pairs):
+        # check the shapes individually, otherwise misplaced values would
+        # not be detected once all values are stacked
+        for actual, desired in pairs:
+            self.assertEqual(np.shape(actual), np.shape(desired))
+        # compare all values at once (with the tolerances of np.allclose)
+        np.testing.assert_allclose(np.hstack([a for a, _ in pairs]),
+                                   np.hstack([d for _, d in pairs]),
+                                   rtol=1e-5, atol=1e-8)
 
 
 class TestOnsetConstantsClass(unittest.TestCase):
@@ -27,7 +59,7 @@ class TestOnsetConstantsClass(unittest.TestCase):
 
 
 # test evaluation function
-class TestOnsetEvaluationFunction(unittest.TestCase):
+class TestOnsetEvaluationFunction(OnsetTestCase):
 
     def test_errors(self):
         # detections / annotations must not be None
@@ -49,49 +81,44 @@ class TestOnsetEvaluationFunction(unittest.TestCase):
     def test_results(self):
         # default window
         tp, fp, tn, fn, errors = onset_evaluation(DETECTIONS, ANNOTATIONS)
-        self.assertTrue(np.allclose(tp, [0.999999, 1.029999, 2.01, 2.02, 2.5]))
-        self.assertTrue(np.allclose(fp, [1.45, 3.025000001]))
-        self.assertTrue(np.allclose(tn, []))
-        self.assertTrue(np.allclose(fn, [1.5, 2.05, 3.0]))
-        self.assertTrue(np.allclose(errors, [-0.00000001, 0.00999999, 0.01,
-                                             -0.01, 0]))
+        self.assertEmpty(tn)
+        self.assertAllClose((tp, [0.999999, 1.029999, 2.01, 2.02, 2.5]),
+                            (fp, [1.45, 3.025000001]),
+                            (fn, [1.5, 2.05, 3.0]),
+                            (errors, [-0.00000001, 0.00999999, 0.01, -0.01,
+                                      0]))
         # window = 0.01
         tp, fp, tn, fn, errors = onset_evaluation(DETECTIONS, ANNOTATIONS,
                                                   window=0.01)
-        self.assertTrue(np.allclose(tp, [0.999999, 1.029999, 2.01, 2.02, 2.5]))
-        self.assertTrue(np.allclose(fp, [1.45, 3.025000001]))
-        self.assertTrue(np.allclose(tn, []))
-        self.assertTrue(np.allclose(fn, [1.5, 2.05, 3.0]))
-        self.assertTrue(np.allclose(errors, [-0.00000001, 0.00999999, 0.01,
-                                             -0.01, 0]))
+        self.assertEmpty(tn)
+        self.assertAllClose((tp, [0.999999, 1.029999, 2.01, 2.02, 2.5]),
+                            (fp, [1.45, 3.025000001]),
+                            (fn, [1.5, 2.05, 3.0]),
+                            (errors, [-0.00000001, 0.00999999, 0.01, -0.01,
+                                      0]))
         # window = 0.04
         tp, fp, tn, fn, errors = onset_evaluation(DETECTIONS, ANNOTATIONS,
                                                   window=0.04)
-        self.assertTrue(np.allclose(tp, [0.999999, 1.029999, 2.01, 2.02, 2.5,
-                                         3.025000001]))
-        self.assertTrue(np.allclose(fp, [1.45]))
-        self.assertTrue(np.allclose(tn, []))
-        self.assertTrue(np.allclose(fn, [1.5, 2.05]))
-        self.assertTrue(np.allclose(errors, [-0.00000001, 0.00999999, 0.01,
-                                             -0.01, 0, 0.025]))
+        self.assertEmpty(tn)
+        self.assertAllClose((tp, [0.999999, 1.029999, 2.01, 2.02, 2.5,
+                                  3.025000001]),
+                            (fp, [1.45]),
+                            (fn, [1.5, 2.05]),
+                            (errors, [-0.00000001, 0.00999999, 0.01, -0.01, 0,
+                                      0.025]))
 
 
 # test evaluation class
-class TestOnsetEvaluationClass(unittest.TestCase):
+class TestOnsetEvaluationClass(OnsetTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # the inputs are the same for all tests, thus evaluate them only once
+        cls.e = OnsetEvaluation(DETECTIONS, ANNOTATIONS)
 
     def test_types(self):
-        e = OnsetEvaluation(DETECTIONS, ANNOTATIONS)
-        self.assertIsInstance(e.num_tp, int)
-        self.assertIsInstance(e.num_fp, int)
-        self.assertIsInstance(e.num_tn, int)
-        self.assertIsInstance(e.num_fn, int)
-        self.assertIsInstance(e.precision, float)
-        self.assertIsInstance(e.recall, float)
-        self.assertIsInstance(e.fmeasure, float)
-        self.assertIsInstance(e.accuracy, float)
-        self.assertIsInstance(e.errors, np.ndarray)
-        self.assertIsInstance(e.mean_error, float)
-        self.assertIsInstance(e.std_error, float)
+        e = self.e
+        self.assertTypes(e, METRIC_TYPES)
 
     def test_conversion(self):
         # conversion from list should work
@@ -117,11 +144,11 @@ class TestOnsetEvaluationClass(unittest.TestCase):
     def test_results(self):
         # empty detections / annotations
         e = OnsetEvaluation([], [])
-        self.assertTrue(np.allclose(e.tp, []))
-        self.assertTrue(np.allclose(e.fp, []))
-        self.assertTrue(np.allclose(e.tn, []))
-        self.assertTrue(np.allclose(e.fn, []))
-        self.assertTrue(np.allclose(e.errors, []))
+        self.assertEmpty(e.tp)
+        self.assertEmpty(e.fp)
+        self.assertEmpty(e.tn)
+        self.assertEmpty(e.fn)
+        self.assertEmpty(e.errors)
         self.assertEqual(e.num_tp, 0)
         self.assertEqual(e.num_fp, 0)
         self.assertEqual(e.num_tn, 0)
@@ -130,16 +157,16 @@ class TestOnsetEvaluationClass(unittest.TestCase):
         self.assertEqual(e.recall, 1)
         self.assertEqual(e.fmeasure, 1)
         self.assertEqual(e.accuracy, 1)
-        self.assertTrue(np.allclose(e.errors, []))
+        self.assertEmpty(e.errors)
         self.assertTrue(math.isnan(e.mean_error))
         self.assertTrue(math.isnan(e.std_error))
 
         # real detections / annotations
-        e = OnsetEvaluation(DETECTIONS, ANNOTATIONS)
-        self.assertTrue(np.allclose(e.tp, [0.99999, 1.02999, 2.01, 2.02, 2.5]))
-        self.assertTrue(np.allclose(e.fp, [1.45, 3.025000001]))
-        self.assertTrue(np.allclose(e.tn, []))
-        self.assertTrue(np.allclose(e.fn, [1.5, 2.05, 3.0]))
+        e = self.e
+        self.assertAllClose((e.tp, [0.99999, 1.02999, 2.01, 2.02, 2.5]))
+        self.assertAllClose((e.fp, [1.45, 3.025000001]))
+        self.assertEmpty(e.tn)
+        self.assertAllClose((e.fn, [1.5, 2.05, 3.0]))
         self.assertEqual(e.num_tp, 5)
         self.assertEqual(e.num_fp, 2)
         self.assertEqual(e.num_tn, 0)
@@ -158,7 +185,7 @@ class TestOnsetEvaluationClass(unittest.TestCase):
         # tar 1,          1.02,       1.5,  2.0,  2.03, 2.05, 2.5, 3
         errors = [0.99999999 - 1, 1.02999999 - 1.02,  # 1.45 - 1.5,
                   2.01 - 2, 2.02 - 2.03, 2.5 - 2.5]  # , 3.030000001 - 3
-        self.assertTrue(np.allclose(e.errors, errors))
+        self.assertAllClose((e.errors, errors))
         mean = np.mean([0.99999999 - 1, 1.02999999 - 1.02, 2.01 - 2,
                         2.02 - 2.03, 2.5 - 2.5])
         self.assertEqual(e.mean_error, mean)
@@ -166,25 +193,39 @@ class TestOnsetEvaluationClass(unittest.TestCase):
                       2.5 - 2.5])
         self.assertEqual(e.std_error, std)
 
+    def test_delay(self):
+        detections = np.copy(DETECTIONS)
+        e = OnsetEvaluation(detections, ANNOTATIONS, delay=10)
+        # the given detections must not be altered
+        self.assertTrue(np.array_equal(detections, DETECTIONS))
+        self.assertAllClose((e.fp, DETECTIONS + 10))
+        self.assertAllClose((e.fn, ANNOTATIONS))
+
+    def test_cached_errors(self):
+        e = OnsetEvaluation(DETECTIONS, ANNOTATIONS)
+        self.assertEqual(e.mean_error, np.mean(e.errors))
+        # replacing the errors must not return the cached statistics
+        e.errors = np.asarray([0.01, 0.03])
+        self.assertEqual(e.mean_error, 0.02)
+        self.assertEqual(e.std_error, 0.01)
+        e.errors = np.zeros(0)
+        self.assertTrue(math.isnan(e.mean_error))
+        self.assertTrue(math.isnan(e.std_error))
+
     def test_tostring(self):
         print(OnsetEvaluation([], []))
 
 
-class TestOnsetSumEvaluationClass(unittest.TestCase):
+class TestOnsetSumEvaluationClass(OnsetTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # the inputs are the same for all tests, thus evaluate them only once
+        cls.e = OnsetEvaluation(DETECTIONS, ANNOTATIONS)
 
     def test_types(self):
         e = OnsetSumEvaluation([])
-        self.assertIsInstance(e.num_tp, int)
-        self.assertIsInstance(e.num_fp, int)
-        self.assertIsInstance(e.num_tn, int)
-        self.assertIsInstance(e.num_fn, int)
-        self.assertIsInstance(e.precision, float)
-        self.assertIsInstance(e.recall, float)
-        self.assertIsInstance(e.fmeasure, float)
-        self.assertIsInstance(e.accuracy, float)
-        self.assertIsInstance(e.errors, np.ndarray)
-        self.assertIsInstance(e.mean_error, float)
-        self.assertIsInstance(e.std_error, float)
+        self.assertTypes(e, METRIC_TYPES)
 
     def test_results(self):
         # empty sum evaluation
@@ -197,7 +238,7 @@ class TestOnsetSumEvaluationClass(unittest.TestCase):
         self.assertEqual(e.recall, 1)
         self.assertEqual(e.fmeasure, 1)
         self.assertEqual(e.accuracy, 1)
-        self.assertTrue(np.allclose(e.errors, []))
+        self.assertEmpty(e.errors)
         self.assertTrue(math.isnan(e.mean_error))
         self.assertTrue(math.isnan(e.std_error))
         # sum evaluation of empty onset evaluation
@@ -211,11 +252,11 @@ class TestOnsetSumEvaluationClass(unittest.TestCase):
         self.assertEqual(e.recall, 1)
         self.assertEqual(e.fmeasure, 1)
         self.assertEqual(e.accuracy, 1)
-        self.assertTrue(np.allclose(e.errors, []))
+        self.assertEmpty(e.errors)
         self.assertTrue(math.isnan(e.mean_error))
         self.assertTrue(math.isnan(e.std_error))
         # sum evaluation of empty and real onset evaluation
-        e2 = OnsetEvaluation(DETECTIONS, ANNOTATIONS)
+        e2 = self.e
         e = OnsetSumEvaluation([e1, e2])
         self.assertEqual(e.num_tp, 5)
         self.assertEqual(e.num_fp, 2)
@@ -231,30 +272,55 @@ class TestOnsetSumEvaluationClass(unittest.TestCase):
         # acc = (TP + TN) / (TP + FP + TN + FN)
         self.assertEqual(e.accuracy, (5. + 0) / (5 + 2 + 0 + 3))
         # errors is just a concatenation of all errors, i.e. those of e2
-        self.assertTrue(np.allclose(e.errors, e2.errors))
+        self.assertAllClose((e.errors, e2.errors))
         # thus mean and std of errors is those of e2
         self.assertEqual(e.mean_error, e2.mean_error)
         self.assertEqual(e.std_error, e2.std_error)
+        # mean and std of errors of multiple evaluations
+        e3 = OnsetEvaluation(ANNOTATIONS, DETECTIONS)
+        e = OnsetSumEvaluation([e1, e2, e3])
+        errors = np.concatenate([e2.errors, e3.errors])
+        self.assertAllClose((e.errors, errors))
+        self.assertAlmostEqual(e.mean_error, np.mean(errors))
+        self.assertAlmostEqual(e.std_error, np.std(errors))
+
+    def test_altered_eval_objects(self):
+        e = OnsetSumEvaluation([self.e, self.e])
+        self.assertEqual(e.num_tp, 10)
+        self.assertEqual(e.num_annotations, 16)
+        # the counters must follow changes of the evaluation objects
+        e.eval_objects.pop(0)
+        self.assertEqual(e.num_tp, 5)
+        self.assertEqual(e.num_annotations, 8)
+        e.eval_objects.append(OnsetEvaluation(ANNOTATIONS, DETECTIONS))
+        self.assertEqual(e.num_tp, 10)
+        self.assertEqual(e.num_fp, 5)
+        self.assertEqual(e.num_fn, 5)
+        # the counters must also follow changes of nested evaluations
+        inner = OnsetSumEvaluation([self.e])
+        outer = OnsetSumEvaluation([inner])
+        self.assertEqual(outer.num_tp, 5)
+        inner.eval_objects.append(self.e)
+        self.assertEqual(outer.num_tp, 10)
+        self.assertEqual(outer.precision, inner.precision)
 
     def test_tostring(self):
         print(OnsetSumEvaluation([]))
 
 
-class TestOnsetMeanEvaluationClass(unittest.TestCase):
+class TestOnsetMeanEvaluationClass(OnsetTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # the inputs are the same for all tests, thus evaluate them only once
+        cls.e = OnsetEvaluation(DETECTIONS, ANNOTATIONS)
+        cls.e_rev = OnsetEvaluation(ANNOTATIONS, DETECTIONS)
 
     def test_types(self):
         e = OnsetMeanEvaluation([])
-        self.assertIsInstance(e.num_tp, float)
-        self.assertIsInstance(e.num_fp, float)
-        self.assertIsInstance(e.num_tn, float)
-        self.assertIsInstance(e.num_fn, float)
-        self.assertIsInstance(e.precision, float)
-        self.assertIsInstance(e.recall, float)
-        self.assertIsInstance(e.fmeasure, float)
-        self.assertIsInstance(e.accuracy, float)
-        self.assertIsInstance(e.errors, np.ndarray)
-        self.assertIsInstance(e.mean_error, float)
-        self.assertIsInstance(e.std_error, float)
+        # the counters are averaged, thus floats
+        self.assertTypes(e, dict(METRIC_TYPES, num_tp=float, num_fp=float,
+                                 num_tn=float, num_fn=float))
 
     def test_results(self):
         # empty mean evaluation
@@ -267,7 +333,7 @@ class TestOnsetMeanEvaluationClass(unittest.TestCase):
         self.assertTrue(math.isnan(e.recall))
         self.assertTrue(math.isnan(e.fmeasure))
         self.assertTrue(math.isnan(e.accuracy))
-        self.assertTrue(np.allclose(e.errors, []))
+        self.assertEmpty(e.errors)
         self.assertTrue(math.isnan(e.mean_error))
         self.assertTrue(math.isnan(e.std_error))
 
@@ -282,33 +348,22 @@ class TestOnsetMeanEvaluationClass(unittest.TestCase):
         self.assertEqual(e.recall, 1)
         self.assertEqual(e.fmeasure, 1)
         self.assertEqual(e.accuracy, 1)
-        self.assertTrue(np.allclose(e.errors, []))
+        self.assertEmpty(e.errors)
         self.assertTrue(math.isnan(e.mean_error))
         self.assertTrue(math.isnan(e.std_error))
 
         # mean evaluation of empty and real onset evaluation
-        e2 = OnsetEvaluation(DETECTIONS, ANNOTATIONS)
-        e3 = OnsetEvaluation(ANNOTATIONS, DETECTIONS)
+        e2 = self.e
+        e3 = self.e_rev
         e = OnsetMeanEvaluation([e1, e2, e3])
-        self.assertTrue(np.allclose(
-            e.num_tp, np.mean([e_.num_tp for e_ in [e1, e2, e3]])))
-        self.assertTrue(np.allclose(
-            e.num_fp, np.mean([e_.num_fp for e_ in [e1, e2, e3]])))
-        self.assertTrue(np.allclose(
-            e.num_tn, np.mean([e_.num_tn for e_ in [e1, e2, e3]])))
-        self.assertTrue(np.allclose(
-            e.num_fn, np.mean([e_.num_fn for e_ in [e1, e2, e3]])))
-        self.assertTrue(np.allclose(
-            e.precision, np.mean([e_.precision for e_ in [e1, e2, e3]])))
-        self.assertTrue(np.allclose(
-            e.recall, np.mean([e_.recall for e_ in [e1, e2, e3]])))
-        self.assertTrue(np.allclose(
-            e.fmeasure, np.mean([e_.fmeasure for e_ in [e1, e2, e3]])))
-        self.assertTrue(np.allclose(
-            e.accuracy, np.mean([e_.accuracy for e_ in [e1, e2, e3]])))
+        self.assertAllClose(*[
+            (getattr(e, metric),
+             np.mean([getattr(e_, metric) for e_ in [e1, e2, e3]]))
+            for metric in ['num_tp', 'num_fp', 'num_tn', 'num_fn',
+                           'precision', 'recall', 'fmeasure', 'accuracy']])
         # errors is just a concatenation of all errors
         # (inherited from SumOnsetEvaluation)
-        self.assertTrue(np.allclose(
+        self.assertAllClose((
             e.errors, np.concatenate([e_.errors for e_ in [e2, e3]])))
         # mean and std errors are those of e2 and e3, since those of e1 are NaN
         self.assertEqual(e.mean_error,